@@ -0,0 +1,156 @@
+"""
+Admission control for the game API.
+
+When a worker is saturated it is better to answer some requests quickly
+with "try again shortly" than to let every game time out together. All
+limits are per worker process:
+
+  * At most ADMISSION_MAX_INFLIGHT (default 4) API requests run at once.
+    Up to ADMISSION_MAX_QUEUE (default 8) more may wait, each for at most
+    ADMISSION_QUEUE_TIMEOUT_MS (default 2000). Anything beyond that gets
+    503. Duplicates waiting on an in-flight call (below) count against the
+    same queue, so at most MAX_INFLIGHT + MAX_QUEUE threads are ever held
+    here. gunicorn.conf.py sizes its thread pool to that sum plus a few
+    spare threads, so there is always a thread free to answer the excess
+    with a 503 instead of leaving it waiting inside the server.
+  * If a front proxy stamps X-Request-Start and the request already waited
+    longer than ADMISSION_MAX_QUEUE_AGE_MS (default 5000) before reaching
+    us, it gets 503 without doing any work. The client has likely given up
+    on it by then.
+  * One request per session at a time. A duplicate of an idempotent call
+    that is already in flight (the browser's /clear_trick timer) waits for
+    the running one and gets the same answer instead of redoing it. Any
+    other overlapping request from that session gets 429.
+
+Shed responses carry Retry-After (ADMISSION_RETRY_AFTER seconds, default 1).
+Static files are never limited.
+"""
+
+import os
+import threading
+import time
+
+from flask import g, request, session
+
+# Endpoints whose duplicates can share one result.
+COLLAPSIBLE_ENDPOINTS = {"clear_trick"}
+EXEMPT_ENDPOINTS = {None, "static", "index", "hashed_asset"}
+
+RETRY_AFTER = os.environ.get("ADMISSION_RETRY_AFTER", "1")
+MAX_INFLIGHT = int(os.environ.get("ADMISSION_MAX_INFLIGHT", "4"))
+MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "8"))
+
+
+class _Call:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.done = threading.Event()
+        self.result = None  # (body, status, mimetype) once the leader finishes
+
+
+def _queue_age(header, now):
+    """Seconds since X-Request-Start, accepting "t=<sec|ms|us>" or a bare number."""
+    if not header:
+        return None
+    value = header[2:] if header.startswith("t=") else header
+    try:
+        stamp = float(value)
+    except ValueError:
+        return None
+    # Work out the unit from the magnitude (seconds ~1e9, ms ~1e12, us ~1e15).
+    while stamp > 1e11:
+        stamp /= 1000.0
+    return now - stamp
+
+
+def install(app, busy_response):
+    """Register admission hooks on `app`.
+
+    `busy_response(message, status)` builds the JSON shed response; the
+    Retry-After header is added here.
+    """
+    queue_timeout = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_MS", "2000")) / 1000.0
+    max_queue_age = float(os.environ.get("ADMISSION_MAX_QUEUE_AGE_MS", "5000")) / 1000.0
+
+    slots = threading.BoundedSemaphore(MAX_INFLIGHT)
+    lock = threading.Lock()
+    state = {"waiting": 0}
+    in_flight = {}  # session id -> _Call
+
+    def shed(message, status):
+        response = busy_response(message, status)
+        response.headers["Retry-After"] = RETRY_AFTER
+        return response
+
+    def enter_queue():
+        with lock:
+            if state["waiting"] >= MAX_QUEUE:
+                return False
+            state["waiting"] += 1
+            return True
+
+    def leave_queue():
+        with lock:
+            state["waiting"] -= 1
+
+    @app.before_request
+    def _admit():
+        if request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        age = _queue_age(request.headers.get("X-Request-Start"), time.time())
+        if age is not None and age > max_queue_age:
+            return shed("Server busy, please retry.", 503)
+
+        sid = session.get("sid")
+        if sid is not None:
+            with lock:
+                call = in_flight.get(sid)
+                if call is None:
+                    in_flight[sid] = g.admission_call = _Call(request.endpoint)
+                    g.admission_sid = sid
+            if call is not None:
+                if call.endpoint != request.endpoint or call.endpoint not in COLLAPSIBLE_ENDPOINTS:
+                    return shed("Another request for this game is in progress.", 429)
+                # A follower holds a thread while it waits, just like a queued request.
+                if not enter_queue():
+                    return shed("Server busy, please retry.", 503)
+                try:
+                    finished = call.done.wait(queue_timeout)
+                finally:
+                    leave_queue()
+                if finished and call.result is not None:
+                    body, status, mimetype = call.result
+                    return app.response_class(body, status=status, mimetype=mimetype)
+                return shed("Server busy, please retry.", 503)
+
+        # Only requests that can't get a slot right away count as queued.
+        if not slots.acquire(blocking=False):
+            if not enter_queue():
+                return shed("Server busy, please retry.", 503)
+            try:
+                acquired = slots.acquire(timeout=queue_timeout)
+            finally:
+                leave_queue()
+            if not acquired:
+                return shed("Server busy, please retry.", 503)
+        g.admission_slot = True
+        return None
+
+    @app.after_request
+    def _publish(response):
+        call = g.get("admission_call")
+        # Only a leader that actually ran publishes; a shed response isn't a result.
+        if call is not None and g.get("admission_slot") and call.endpoint in COLLAPSIBLE_ENDPOINTS:
+            call.result = (response.get_data(), response.status_code, response.mimetype)
+        return response
+
+    @app.teardown_request
+    def _release(exc):
+        if g.pop("admission_slot", False):
+            slots.release()
+        call = g.pop("admission_call", None)
+        if call is not None:
+            with lock:
+                if in_flight.get(g.admission_sid) is call:
+                    del in_flight[g.admission_sid]
+            call.done.set()
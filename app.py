@@ -1,21 +1,108 @@
+import gzip
+import hmac
 import os
+import threading
 import uuid
-from flask import Flask, request, jsonify, send_from_directory, session
+from flask import Flask, request, jsonify, send_from_directory, session, abort, g
 from game_logic import Game
-from store import load_game, save_game, delete_game
+from store import load_game, save_game, delete_game, StoreUnavailable
+from assets import load_manifest, send_precompressed, IMMUTABLE_MAX_AGE
+import profiler
+import admission
 
 app = Flask(__name__, static_folder="static", static_url_path="")
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-change-me")
 
+# Built by `python assets.py`; None means serve the unbundled static files.
+asset_manifest = load_manifest(app.static_folder)
+hashed_assets = set(asset_manifest["files"].values()) if asset_manifest else set()
+
+# /bot/batch is disabled (404) unless this is set, and then requires a
+# matching X-Bot-Token header: each call can create thousands of games.
+BOT_API_TOKEN = os.environ.get("BOT_API_TOKEN")
+BOT_BATCH_MAX_ACTIONS = int(os.environ.get("BOT_BATCH_MAX_ACTIONS", "5000"))
+
+# JSON bodies smaller than this aren't worth the CPU to gzip.
+JSON_GZIP_MIN_BYTES = int(os.environ.get("JSON_GZIP_MIN_BYTES", "1024"))
+
 def get_session_id():
     if "sid" not in session:
         session["sid"] = str(uuid.uuid4())
     session.permanent = True
     return session["sid"]
 
+def load_session_game(sid):
+    game = load_game(sid)
+    if game is not None:
+        # Profiler tags: the phase the move started from, not the one it ended in.
+        g.game_tags = {"phase": game.phase, "mode": game.mode}
+    return game
+
+def save_session_game(sid, game):
+    state_bytes = save_game(sid, game)
+    g.setdefault("game_tags", {"phase": None, "mode": game.mode})["state_bytes"] = state_bytes
+
+def describe_game():
+    # Only called for requests the profiler is about to dump; reads what the
+    # route already recorded instead of touching the store again.
+    return g.get("game_tags", {})
+
+# No-op unless PROFILE_DIR is set; see profiler.py for the knobs.
+profiler.install(app, describe=describe_game)
+
+@app.after_request
+def compress_json(response):
+    if (
+        response.mimetype != "application/json"
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not request.accept_encodings["gzip"]
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < JSON_GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=5))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+def busy_response(message, status):
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+# Registered after compress_json so its after_request hook (hooks run in
+# reverse) sees uncompressed bodies when sharing collapsed results.
+admission.install(app, busy_response)
+
+def error_response(e):
+    if isinstance(e, StoreUnavailable):
+        # A database stall is transient; tell the client to back off rather
+        # than reporting a server bug.
+        response = jsonify({"error": "Game storage is busy, please retry."})
+        response.headers["Retry-After"] = admission.RETRY_AFTER
+        return response, 503
+    return jsonify({"error": str(e)}), 500
+
 @app.route("/")
 def index():
-    return send_from_directory(app.static_folder, "index.html")
+    if asset_manifest is None:
+        return send_from_directory(app.static_folder, "index.html")
+    response = send_precompressed(app.static_folder, asset_manifest, "index.html", request.accept_encodings)
+    response.cache_control.no_cache = True
+    return response
+
+@app.route("/assets/<path:filename>")
+def hashed_asset(filename):
+    if filename not in hashed_assets:
+        abort(404)
+    response = send_precompressed(
+        app.static_folder, asset_manifest, filename, request.accept_encodings, max_age=IMMUTABLE_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 @app.route("/start_game", methods=["POST"])
 def start_game():
@@ -25,76 +112,76 @@ def start_game():
         mode = data.get("mode", "2p")
         instructional = data.get("instructional", False)
         game = Game(mode=mode, instructional=instructional)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(game.to_dict())
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/bid", methods=["POST"])
 def bid():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         data = request.get_json()
         player_bid = data.get("bid", 0)
         game.process_bid(player_bid)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(game.to_dict())
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/select_trump", methods=["POST"])
 def select_trump():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         data = request.get_json()
         trump = data.get("trump")
         game.select_trump(trump)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(game.to_dict())
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/confirm_kitty", methods=["POST"])
 def confirm_kitty():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         data = request.get_json()
         keptIndices = data.get("keptIndices", [])
         game.confirm_kitty(keptIndices)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(game.to_dict())
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/confirm_draw", methods=["POST"])
 def confirm_draw():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         data = request.get_json()
         keptIndices = data.get("keptIndices", None)
         game.confirm_draw(keptIndices)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(game.to_dict())
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/play_trick", methods=["POST"])
 def play_trick():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         data = request.get_json()
@@ -102,23 +189,23 @@ def play_trick():
         if cardText is None:
             return jsonify({"error": "cardText required."}), 500
         state = game.play_card("player", cardText)
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(state)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/clear_trick", methods=["POST"])
 def clear_trick():
     try:
         sid = get_session_id()
-        game = load_game(sid)
+        game = load_session_game(sid)
         if not game:
             return jsonify({"error": "No game started."}), 500
         state = game.clear_trick()
-        save_game(sid, game)
+        save_session_game(sid, game)
         return jsonify(state)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/reset_game", methods=["POST"])
 def reset_game():
@@ -127,7 +214,115 @@ def reset_game():
         delete_game(sid)
         return jsonify({"message": "Game reset. Please start a new game."})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+# Bot games are keyed by an explicit client-chosen id rather than the cookie
+# session, under their own prefix so they can't collide with browser games.
+def bot_store_key(game_id):
+    return f"bot:{game_id}"
+
+def bot_play_card(game, a):
+    if a.get("cardText") is None:
+        raise ValueError("cardText required.")
+    return game.play_card("player", a["cardText"])
+
+# Bot game ids currently being processed by a batch in this worker. A
+# second batch touching the same id is refused rather than racing the
+# first one's load/save. Like admission.py this is per process, so bots
+# should keep a given game on one connection.
+bot_games_in_flight = set()
+bot_games_lock = threading.Lock()
+
+BOT_ACTIONS = {
+    "bid": lambda game, a: game.process_bid(a.get("bid", 0)),
+    "select_trump": lambda game, a: game.select_trump(a.get("trump")),
+    "confirm_kitty": lambda game, a: game.confirm_kitty(a.get("keptIndices", [])),
+    "confirm_draw": lambda game, a: game.confirm_draw(a.get("keptIndices", None)),
+    "play_trick": bot_play_card,
+    "clear_trick": lambda game, a: game.clear_trick(),
+}
+
+@app.route("/bot/batch", methods=["POST"])
+def bot_batch():
+    """Apply a batch of {"game_id", "action", ...} entries.
+
+    Actions are grouped by game and applied in order, with one store read
+    and one write per game. A game's actions are all-or-nothing: if one
+    fails, the rest for that game are skipped and nothing is saved for it.
+    "start_game" (with optional "mode") creates or replaces the game and
+    may be followed by further actions for the same id in the same batch;
+    "delete_game" removes it from the store. A game already being handled
+    by another batch is skipped with "code": 409 in its result.
+    """
+    if not BOT_API_TOKEN:
+        abort(404)
+    supplied = request.headers.get("X-Bot-Token", "").encode("utf-8")
+    if not hmac.compare_digest(supplied, BOT_API_TOKEN.encode("utf-8")):
+        return jsonify({"error": "Invalid bot token."}), 403
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object."}), 400
+    actions = data.get("actions")
+    if not isinstance(actions, list):
+        return jsonify({"error": "actions must be a list."}), 400
+    if len(actions) > BOT_BATCH_MAX_ACTIONS:
+        return jsonify({"error": f"At most {BOT_BATCH_MAX_ACTIONS} actions per batch."}), 413
+
+    by_game = {}
+    for a in actions:
+        game_id = a.get("game_id") if isinstance(a, dict) else None
+        if not isinstance(game_id, str) or not game_id:
+            return jsonify({"error": "Every action needs a string game_id."}), 400
+        by_game.setdefault(game_id, []).append(a)
+
+    with bot_games_lock:
+        busy = bot_games_in_flight.intersection(by_game)
+        claimed = set(by_game) - busy
+        bot_games_in_flight.update(claimed)
+
+    results = []
+    try:
+        for game_id, game_actions in by_game.items():
+            result = {"game_id": game_id, "applied": 0}
+            if game_id in busy:
+                result.update(ok=False, code=409, error="Game is being updated by another batch.")
+                results.append(result)
+                continue
+            try:
+                if game_actions[0].get("action") in ("start_game", "delete_game"):
+                    game = None
+                else:
+                    game = load_game(bot_store_key(game_id))
+                    if game is None:
+                        raise ValueError("No game started.")
+                for a in game_actions:
+                    name = a.get("action")
+                    if name == "start_game":
+                        game = Game(mode=a.get("mode", "2p"))
+                        game.ai_delay = 0
+                    elif name == "delete_game":
+                        game = None
+                    elif name in BOT_ACTIONS:
+                        if game is None:
+                            raise ValueError("No game started.")
+                        BOT_ACTIONS[name](game, a)
+                    else:
+                        raise ValueError(f"Unknown action: {name}")
+                    result["applied"] += 1
+                if game is None:
+                    delete_game(bot_store_key(game_id))
+                else:
+                    save_game(bot_store_key(game_id), game)
+                result["ok"] = True
+                result["state"] = game.to_compact_dict() if game is not None else None
+            except Exception as e:
+                result["ok"] = False
+                result["error"] = str(e)
+            results.append(result)
+    finally:
+        with bot_games_lock:
+            bot_games_in_flight.difference_update(claimed)
+    return jsonify({"results": results})
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,147 @@
+"""
+Static asset pipeline for the single-page client.
+
+static/index.html pulls in its stylesheet and script by plain names
+(app.css, app.js) so the page works straight out of the static folder during
+development. Running `python assets.py` builds a production copy under
+static/dist: every asset is renamed with a content hash (e.g.
+app.3f2a9c1b.css), index.html is rewritten to point at those names, and
+gzip (plus brotli, if the optional `brotli` package is installed) variants
+are written next to each file. A manifest.json records what was built.
+
+At runtime app.py only reads the manifest and hands the matching prebuilt
+file to send_file, so workers never hash or compress static bytes
+themselves. Fingerprinted files never change under the same name and can be
+cached forever; index.html is revalidated with its ETag on every load.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import request, send_file
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_URL_PREFIX = "assets/"
+
+# Files referenced from index.html that get a content hash in their name.
+FINGERPRINTED = ["app.css", "app.js"]
+
+# Preferred first when the client accepts more than one.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _fingerprint(name, data):
+    base, ext = os.path.splitext(name)
+    return f"{base}.{_digest(data)}{ext}"
+
+
+def _write_variants(path, data):
+    """Write precompressed siblings of `path` and return their encodings."""
+    encodings = []
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+        encodings.append("br")
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 keeps the output byte-for-byte reproducible between builds.
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+    return encodings
+
+
+def build(static_dir=STATIC_DIR):
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+
+    # "digests" holds a content hash per built file; it becomes the ETag so
+    # identical content gets the same ETag across builds and servers.
+    manifest = {"files": {}, "encodings": {}, "digests": {}}
+    with open(os.path.join(static_dir, "index.html"), encoding="utf-8") as f:
+        html = f.read()
+
+    for name in FINGERPRINTED:
+        with open(os.path.join(static_dir, name), "rb") as f:
+            data = f.read()
+        hashed = _fingerprint(name, data)
+        path = os.path.join(dist_dir, hashed)
+        with open(path, "wb") as f:
+            f.write(data)
+        manifest["files"][name] = hashed
+        manifest["digests"][hashed] = _digest(data)
+        manifest["encodings"][hashed] = _write_variants(path, data)
+        for quote in ('"', "'"):
+            html = html.replace(f"{quote}{name}{quote}", f"{quote}{ASSET_URL_PREFIX}{hashed}{quote}")
+
+    html_bytes = html.encode("utf-8")
+    index_path = os.path.join(dist_dir, "index.html")
+    with open(index_path, "wb") as f:
+        f.write(html_bytes)
+    manifest["encodings"]["index.html"] = _write_variants(index_path, html_bytes)
+    manifest["digests"]["index.html"] = _digest(html_bytes)
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    """Return the build manifest, or None if `python assets.py` hasn't run."""
+    path = os.path.join(static_dir, DIST_DIRNAME, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def send_precompressed(static_dir, manifest, name, accept_encodings, max_age=None):
+    """Serve a built file, picking the best prebuilt encoding the client accepts."""
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    available = manifest["encodings"].get(name, [])
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    chosen, suffix = None, ""
+    for encoding, ext in ENCODINGS:
+        if encoding in available and accept_encodings[encoding]:
+            chosen, suffix = encoding, ext
+            break
+    response = send_file(
+        os.path.join(dist_dir, name + suffix),
+        mimetype=mimetype,
+        # Name the logical file in Content-Disposition, not the .br/.gz variant.
+        download_name=name,
+        conditional=False,
+        etag=False,
+        max_age=max_age,
+    )
+    # The file's mtime changes on every build, so validate on content only.
+    # Each encoding is a distinct representation and gets its own tag.
+    response.headers.pop("Last-Modified", None)
+    response.set_etag(f"{manifest['digests'][name]}-{chosen or 'identity'}")
+    if chosen:
+        response.headers["Content-Encoding"] = chosen
+    response.vary.add("Accept-Encoding")
+    return response.make_conditional(request)
+
+
+if __name__ == "__main__":
+    built = build()
+    for original, hashed in sorted(built["files"].items()):
+        print(f"{original} -> {DIST_DIRNAME}/{hashed} ({', '.join(built['encodings'][hashed])})")
@@ -52,6 +52,19 @@ OFFSUIT_RANKINGS = {
     "♠": ["K", "Q", "J", "A", "2", "3", "4", "5", "6", "7", "8", "9"]
 }
 
+# Rank -> strength lookups derived once from the orderings above, so the hot
+# paths do a dict lookup instead of list.index(). Built at import, which
+# under `gunicorn --preload` means once in the master, shared copy-on-write.
+TRUMP_VALUES = {
+    suit: {rank: len(ranking) - i for i, rank in enumerate(ranking)}
+    for suit, ranking in TRUMP_RANKINGS.items()
+}
+
+OFFSUIT_VALUES = {
+    suit: {rank: len(ranking) - i for i, rank in enumerate(ranking)}
+    for suit, ranking in OFFSUIT_RANKINGS.items()
+}
+
 def is_trump(card, trump_suit):
     if card.suit == trump_suit:
         return True
@@ -60,17 +73,40 @@ def is_trump(card, trump_suit):
     return False
 
 def get_trump_value(card, trump_suit):
-    ranking = TRUMP_RANKINGS[trump_suit]
-    return len(ranking) - ranking.index(card.rank)
+    return TRUMP_VALUES[trump_suit][card.rank]
 
 def get_offsuit_value(card):
-    ranking = OFFSUIT_RANKINGS[card.suit]
-    return len(ranking) - ranking.index(card.rank)
+    return OFFSUIT_VALUES[card.suit][card.rank]
+
+def _bid_card_score(suit, rank, trump_suit):
+    if suit == trump_suit or (suit == "♥" and rank == "A"):
+        return TRUMP_VALUES[trump_suit][rank] * 1.5, True
+    if rank == "A":
+        return 4, False
+    if rank == "K":
+        return 2, False
+    return 0, False
+
+# (score, is_trump) for every card under every trump suit, as used by
+# Game.hand_strength when the AI sizes its bid.
+BID_CARD_SCORES = {
+    trump_suit: {
+        f"{rank}{suit}": _bid_card_score(suit, rank, trump_suit)
+        for suit in TRUMP_RANKINGS
+        for rank in TRUMP_RANKINGS[suit]
+    }
+    for trump_suit in TRUMP_RANKINGS
+}
 
 # ---------------------------
 # Game Class
 # ---------------------------
 class Game:
+    # Pause before each AI card so the browser can animate plays. Bot-driven
+    # games set this to 0. A class attribute so games pickled before it
+    # existed still load.
+    ai_delay = 0.3
+
     def __init__(self, mode="2p", instructional=False):
         self.mode = mode
         self.instructional = instructional
@@ -109,11 +145,20 @@ class Game:
         self.currentTurn = None
         self.bidder = None
         self.bid = 0
-        self.trumpCardsPlayed = []
         self.combinedHand = []
         self.trick_count = 0  # Initialize trick counter for the hand
+        # Running per-hand aggregates, updated as each card/trick lands.
+        self.tricksWon = {p: 0 for p in self.players}
+        self.highestTrump = None  # (player, card) of the best trump played so far
         self.deal_hands()
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Games pickled before the running aggregates existed carry
+        # trumpCardsPlayed instead.
+        if "tricksWon" not in state:
+            self._rebuild_hand_aggregates(self.__dict__.pop("trumpCardsPlayed", []))
+
     def next_player(self, current):
         idx = self.player_order.index(current)
         return self.player_order[(idx + 1) % len(self.player_order)] if self.player_order else "player"
@@ -131,10 +176,11 @@ class Game:
         self.lastTrick = []
         self.trickLog = []
         self.bidHistory = {}
-        self.trumpCardsPlayed = []
         self.combinedHand = []
         self.computerDrawCounts = {}
         self.trick_count = 0  # Reset trick counter for each hand
+        self.tricksWon = {p: 0 for p in self.players}
+        self.highestTrump = None
         if self.mode == "2p":
             if self.dealer == "player":
                 comp_id = self.player_order[1]
@@ -150,15 +196,14 @@ class Game:
         trump or draw well)."""
         score = 0.0
         trump_count = 0
+        card_scores = BID_CARD_SCORES[suit]
         for card in hand:
-            if is_trump(card, suit):
+            # Top of the trump ranking is worth most; off-suit Aces/Kings
+            # get partial credit (see _bid_card_score).
+            card_score, trump = card_scores[card.text]
+            score += card_score
+            if trump:
                 trump_count += 1
-                # Top of the trump ranking is worth most.
-                score += get_trump_value(card, suit) * 1.5
-            elif card.rank == "A":
-                score += 4
-            elif card.rank == "K":
-                score += 2
         # Holding many trump is disproportionately strong in 45s.
         if trump_count >= 3:
             score += 8
@@ -380,6 +425,7 @@ class Game:
         card = hand.pop(index)
         card.selected = True
         self.currentTrick.append({"player": player, "card": card})
+        self.record_card_played(player, card)
         timestamp = time.strftime("%H:%M:%S")
         self.gameNotes.append(f"{timestamp} - {player} played {card}")
         self.currentTurn = self.next_player(player)
@@ -446,7 +492,8 @@ class Game:
 
     def auto_play(self):
         while self.currentTurn != "player" and len(self.currentTrick) < len(self.player_order):
-            time.sleep(0.3)
+            if self.ai_delay:
+                time.sleep(self.ai_delay)
             available = self.players[self.currentTurn]["hand"]
             if not available:
                 break
@@ -479,12 +526,13 @@ class Game:
         trick_summary += f". Winner: {winner}."
         self.gameNotes.append(trick_summary)
         self.trickLog.append(trick_summary)
-        self.lastTrick = self.currentTrick.copy()
+        # The finished trick list is shared by lastTrick and the winner's
+        # history; currentTrick is rebound, never mutated, after this.
+        trick = self.currentTrick
+        self.lastTrick = trick
         self.lastTrickWinner = winner
-        self.players[winner]["tricks"].append(self.currentTrick.copy())
-        for entry in self.currentTrick:
-            if is_trump(entry["card"], self.trump_suit):
-                self.trumpCardsPlayed.append((entry["player"], entry["card"]))
+        self.players[winner]["tricks"].append(trick)
+        self.tricksWon[winner] += 1
         self.currentTrick = []
         self.phase = "trickComplete"
         self.currentTurn = winner if winner is not None else "player"
@@ -515,24 +563,50 @@ class Game:
                 winner_entry = trick[0]
         return winner_entry["player"]
 
+    def record_card_played(self, player, card):
+        """Fold one played card into the running hand aggregates."""
+        if not is_trump(card, self.trump_suit):
+            return
+        # Strictly greater, so on a tie the earlier card keeps the bonus.
+        if self.highestTrump is None or (
+            get_trump_value(card, self.trump_suit) > get_trump_value(self.highestTrump[1], self.trump_suit)
+        ):
+            self.highestTrump = (player, card)
+
+    def _rebuild_hand_aggregates(self, trump_cards_played):
+        # trump_cards_played holds the finished tricks' trumps in play order;
+        # the cards of the trick in progress come after them.
+        self.tricksWon = {p: len(self.players[p]["tricks"]) for p in self.players}
+        self.highestTrump = None
+        for player, card in trump_cards_played:
+            self.record_card_played(player, card)
+        for entry in self.currentTrick:
+            self.record_card_played(entry["player"], entry["card"])
+
+    def hand_points(self):
+        """Points each player has earned so far this hand, before the bid
+        penalty. The highest-trump bonus goes to whoever holds it now."""
+        points = {p: self.tricksWon[p] * 5 for p in self.players}
+        if self.highestTrump is not None:
+            points[self.highestTrump[0]] += 5
+        return points
+
+    def bid_reached_so_far(self):
+        """Whether the bidder's points so far this hand cover their bid.
+
+        Provisional: a later, higher trump can take the bonus away and flip
+        this back to False. None outside trick play, when there is no bid
+        in progress for this hand.
+        """
+        if self.phase not in ("trick", "trickComplete") or self.bidder not in self.players:
+            return None
+        return self.hand_points()[self.bidder] >= self.bid
+
     def complete_hand(self):
-        points = {p: len(self.players[p]["tricks"]) * 5 for p in self.players}
-        bonus_winner = None
-        bonus_value = 5
-        trump_played = self.trumpCardsPlayed.copy()
-        if not trump_played:
-            for p in self.players:
-                for trick in self.players[p]["tricks"]:
-                    for entry in trick:
-                        card = entry["card"]
-                        if is_trump(card, self.trump_suit):
-                            trump_played.append((p, card))
-        if trump_played:
-            bonus_winner, _ = max(trump_played, key=lambda x: get_trump_value(x[1], self.trump_suit))
-        elif self.currentTurn:
-            bonus_winner = self.currentTurn
-        if bonus_winner:
-            points[bonus_winner] += bonus_value
+        points = self.hand_points()
+        if self.highestTrump is None and self.currentTurn:
+            # No trump came out all hand: the bonus goes to the last trick's winner.
+            points[self.currentTurn] += 5
         if self.bidder in points and points[self.bidder] < self.bid:
             points[self.bidder] = -self.bid
         hand_summary_parts = []
@@ -580,7 +654,11 @@ class Game:
             "gameNotes": self.gameNotes,
             "handScores": self.handScores,
             "mode": self.mode,
-            "bidder": self.bidder
+            "bidder": self.bidder,
+            "tricksWon": self.tricksWon,
+            "highestTrump": ({"player": self.highestTrump[0], "card": self.highestTrump[1].to_dict()}
+                             if self.highestTrump else None),
+            "bidReachedSoFar": self.bid_reached_so_far()
         }
         if self.phase == "kitty" and self.bidder == "player":
             state["originalHand"] = [card.to_dict() for card in self.players["player"]["hand"]]
@@ -593,3 +671,25 @@ class Game:
             else:
                 state["computerDrawCounts"] = self.computerDrawCounts
         return state
+
+    def to_compact_dict(self):
+        """Minimal state for automated clients: no logs, cards as text."""
+        return {
+            "phase": self.phase,
+            "turn": self.currentTurn if self.currentTurn is not None else "player",
+            "hand": [card.text for card in self.players["player"]["hand"]],
+            "trick": [[entry["player"], entry["card"].text] for entry in self.currentTrick],
+            "lastTrick": [[entry["player"], entry["card"].text] for entry in self.lastTrick],
+            "lastTrickWinner": self.lastTrickWinner,
+            "trump": self.trump_suit if self.phase not in ["bidding"] else None,
+            "bid": self.bid,
+            "bidder": self.bidder,
+            "dealer": self.dealer,
+            "kitty": [card.text for card in self.kitty] if self.phase == "kitty" and self.bidder == "player" else [],
+            "scores": {p: self.players[p]["score"] for p in self.players},
+            "handsPlayed": len(self.handScores),
+            "tricksWon": self.tricksWon,
+            "highestTrump": [self.highestTrump[0], self.highestTrump[1].text] if self.highestTrump else None,
+            "bidReachedSoFar": self.bid_reached_so_far(),
+            "message": self.biddingMessage,
+        }
@@ -0,0 +1,81 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+The app is imported once in the master (preload_app) so game_logic's
+precomputed tables and the rest of the imported code live in pages the
+workers share copy-on-write. store.py opens no database connection at
+import, so nothing unsafe crosses fork(); each worker opens its engine and
+first connection in post_worker_init, before it accepts requests, so that
+cost lands in worker startup rather than on some player's first move. Run
+`python store.py migrate` once per deploy and set STORE_AUTO_MIGRATE=0 to
+keep DDL out of worker startup entirely.
+
+Each worker runs threads, so a request sleeping in auto_play or waiting on
+Postgres doesn't block the whole worker. admission.py caps running requests
+at ADMISSION_MAX_INFLIGHT and holds at most ADMISSION_MAX_QUEUE more
+(queued requests plus duplicates waiting on an in-flight call). The thread
+pool defaults to that sum plus SHED_THREADS spare threads. Requests held by
+admission can never occupy the spare threads, so even at saturation some
+thread is always free to answer the excess with an immediate 503. Anything
+gunicorn has to queue behind those threads is only waiting for a fast
+rejection, not for a slot. GUNICORN_THREADS overrides the pool size; set it
+to 1 for the old one-request-per-worker sync model.
+
+Keep-alive stays on (GUNICORN_KEEPALIVE seconds, default 2) so bots and
+the load generator reuse connections. An idle keep-alive connection sits in
+gunicorn's poller without a thread, so worker_connections
+(GUNICORN_WORKER_CONNECTIONS, default 1000) only bounds how many sockets a
+worker keeps open. Behind a proxy that doesn't reuse upstream connections,
+GUNICORN_KEEPALIVE=0 closes each one after its response.
+
+Startup cost is logged: how long the master took to import the app, and for
+every worker how long it took from fork to ready to serve, including the
+share of that spent opening the store.
+"""
+
+import gc
+import os
+import time
+
+import admission
+import store
+
+_config_loaded = time.monotonic()
+
+preload_app = True
+SHED_THREADS = 4
+threads = int(os.environ.get("GUNICORN_THREADS", admission.MAX_INFLIGHT + admission.MAX_QUEUE + SHED_THREADS))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "1000"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "2"))
+
+
+def when_ready(server):
+    # Move everything allocated so far out of the GC's reach; otherwise the
+    # first collection in each worker touches (and un-shares) those pages.
+    gc.freeze()
+    if 1 < threads <= admission.MAX_INFLIGHT + admission.MAX_QUEUE:
+        server.log.warning(
+            "GUNICORN_THREADS=%d leaves no spare threads above ADMISSION_MAX_INFLIGHT + "
+            "ADMISSION_MAX_QUEUE (%d); excess requests will wait inside gunicorn instead of being shed",
+            threads, admission.MAX_INFLIGHT + admission.MAX_QUEUE,
+        )
+    server.log.info("Master ready: app preloaded in %.1f ms", (time.monotonic() - _config_loaded) * 1000)
+
+
+def pre_fork(server, worker):
+    worker.fork_started = time.monotonic()
+
+
+def post_worker_init(worker):
+    try:
+        store_seconds = store.warm_up()
+    except store.StoreUnavailable as e:
+        # Don't crash-loop the worker; the first request will retry.
+        worker.log.warning("Worker %s could not open the store yet: %s", worker.pid, e)
+        store_seconds = None
+    worker.log.info(
+        "Worker %s ready %.1f ms after fork (store %s)",
+        worker.pid,
+        (time.monotonic() - worker.fork_started) * 1000,
+        "not used" if store_seconds is None else "%.1f ms" % (store_seconds * 1000),
+    )
@@ -0,0 +1,304 @@
+"""
+Open-loop load generator for the game API.
+
+Simulated players arrive at a fixed rate (--rate per second) regardless of
+how quickly earlier players are being served, so a saturated server shows up
+as climbing latency instead of a politely slowed-down client. Each player has
+its own cookie session and plays real games through the same endpoints the
+browser uses: /start_game -> /bid -> /select_trump -> /confirm_kitty ->
+/confirm_draw -> /play_trick / /clear_trick, always choosing a legal card
+from the returned playerHand.
+
+Two targets are supported:
+
+    python loadtest.py --players 50 --rate 5
+        Drives app.app in-process through Flask test clients. Whatever store
+        the environment selects is used: the in-memory dict by default, or a
+        local Postgres stand-in when DATABASE_URL is set.
+
+    python loadtest.py --url http://127.0.0.1:8000 --players 200 --rate 20
+        Drives a running server (e.g. gunicorn) over keep-alive HTTP
+        connections, one per player.
+
+At the end it prints throughput plus p50/p95/p99 latency per route. Those
+percentiles cover served responses only: requests the server shed with
+429/503 are counted in their own "shed" column and kept out of them, so
+fast rejections can't make an overloaded server look quick. The "e2e"
+columns measure each logical call from its first attempt to its final
+outcome, including shed attempts and the Retry-After back-off between them,
+which is the latency a player actually experiences.
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+SUITS = ["♥", "♦", "♣", "♠"]
+BIDS = [0, 15, 20, 25, 30]
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, payload):
+        response = self.client.post(path, json=payload)
+        return response.status_code, response.get_json(silent=True), response.headers.get("Retry-After")
+
+    def close(self):
+        pass
+
+
+class HTTPClient:
+    """One keep-alive connection and cookie jar per simulated player."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = conn_cls(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.cookies = SimpleCookie()
+
+    def post(self, path, payload):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={m.value}" for k, m in self.cookies.items())
+        try:
+            self.conn.request("POST", self.prefix + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # The server may have dropped an idle keep-alive connection.
+            self.conn.close()
+            raise
+        data = response.read()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        retry_after = response.getheader("Retry-After")
+        try:
+            return response.status, json.loads(data), retry_after
+        except ValueError:
+            return response.status, None, retry_after
+
+    def close(self):
+        self.conn.close()
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)  # served attempts only
+        self.end_to_end = defaultdict(list)  # first attempt to final outcome
+        self.errors = defaultdict(int)
+        self.shed = defaultdict(int)
+        self.games_finished = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+    def record_shed(self, route):
+        with self.lock:
+            self.shed[route] += 1
+
+    def record_end_to_end(self, route, seconds):
+        with self.lock:
+            self.end_to_end[route].append(seconds)
+
+    def player_started(self):
+        with self.lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def player_stopped(self, finished):
+        with self.lock:
+            self.active -= 1
+            if finished:
+                self.games_finished += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank method.
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def is_trump(card, trump_suit):
+    return card["suit"] == trump_suit or (card["suit"] == "♥" and card["rank"] == "A")
+
+
+def legal_cards(state):
+    """Mirror Game.validate_move for the human player's hand."""
+    hand = state["playerHand"]
+    trump = state["trumpSuit"]
+    if not state["currentTrick"]:
+        return hand
+    lead = state["currentTrick"][0]["card"]
+    if is_trump(lead, trump):
+        trumps = [c for c in hand if is_trump(c, trump)]
+        return trumps or hand
+    following = [c for c in hand if c["suit"] == lead["suit"] or is_trump(c, trump)]
+    if any(c["suit"] == lead["suit"] for c in hand):
+        return following
+    return hand
+
+
+class Player:
+    def __init__(self, client, stats, mode, max_hands, clear_delay, rng):
+        self.client = client
+        self.stats = stats
+        self.mode = mode
+        self.max_hands = max_hands
+        self.clear_delay = clear_delay
+        self.rng = rng
+
+    def call(self, route, payload, retries=3):
+        first = time.perf_counter()
+        try:
+            for attempt in range(retries + 1):
+                started = time.perf_counter()
+                try:
+                    status, state, retry_after = self.client.post(route, payload)
+                except Exception:
+                    self.stats.record(route, time.perf_counter() - started, False)
+                    return None
+                if status in (429, 503):
+                    # Load shed by the server; back off like the browser does.
+                    self.stats.record_shed(route)
+                    if attempt < retries:
+                        time.sleep(float(retry_after or 1))
+                    continue
+                ok = status == 200 and isinstance(state, dict) and "error" not in state
+                self.stats.record(route, time.perf_counter() - started, ok)
+                return state if ok else None
+            return None
+        finally:
+            self.stats.record_end_to_end(route, time.perf_counter() - first)
+
+    def next_action(self, state):
+        phase = state["gamePhase"]
+        if phase == "bidding":
+            return "/bid", {"bid": self.rng.choice(BIDS)}
+        if phase == "trump":
+            return "/select_trump", {"trump": self.rng.choice(SUITS)}
+        if phase == "kitty":
+            total = len(state.get("originalHand", [])) + len(state.get("kitty", []))
+            kept = self.rng.sample(range(total), min(5, total))
+            if not any(i < len(state.get("originalHand", [])) for i in kept):
+                kept[0] = 0
+            return "/confirm_kitty", {"keptIndices": kept}
+        if phase == "draw":
+            hand = state.get("drawHand", [])
+            kept = [i for i in range(len(hand)) if self.rng.random() < 0.6]
+            return "/confirm_draw", {"keptIndices": kept}
+        if phase == "trickComplete":
+            if self.clear_delay:
+                time.sleep(self.clear_delay)
+            return "/clear_trick", {}
+        if phase == "trick":
+            if state["currentTurn"] != "player" or not state["playerHand"]:
+                return "/clear_trick", {}
+            card = self.rng.choice(legal_cards(state))
+            return "/play_trick", {"cardText": card["text"]}
+        return None
+
+    def run(self):
+        self.stats.player_started()
+        finished = False
+        try:
+            state = self.call("/start_game", {"mode": self.mode, "instructional": False})
+            last_route = None
+            while state is not None:
+                if state["gamePhase"] == "finished" or len(state["handScores"]) >= self.max_hands:
+                    finished = True
+                    break
+                action = self.next_action(state)
+                if action is None:
+                    break
+                route, payload = action
+                if route == "/bid" and last_route == "/bid":
+                    # The previous bid was rejected (the dealer must pass or
+                    # overbid by exactly 5); passing is always legal.
+                    payload = {"bid": 0}
+                last_route = route
+                state = self.call(route, payload)
+        finally:
+            self.stats.player_stopped(finished)
+            self.client.close()
+
+
+def report(stats, elapsed, out=print):
+    total = sum(len(v) for v in stats.latencies.values()) + sum(stats.shed.values())
+    errors = sum(stats.errors.values())
+    shed = sum(stats.shed.values())
+    out(f"elapsed {elapsed:.1f}s, {total} requests, {total / elapsed:.1f} req/s, "
+        f"{errors} errors, {shed} shed (429/503), {stats.games_finished} games completed, "
+        f"peak {stats.peak_active} concurrent players")
+    out(f"{'route':<16}{'served':>8}{'req/s':>9}{'errors':>8}{'shed':>7}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'max ms':>10}{'e2e p50':>10}{'e2e p99':>10}")
+    for route in sorted(set(stats.latencies) | set(stats.end_to_end)):
+        values = sorted(stats.latencies[route])
+        e2e = sorted(stats.end_to_end[route])
+        out(f"{route:<16}{len(values):>8}{len(values) / elapsed:>9.1f}{stats.errors[route]:>8}{stats.shed[route]:>7}"
+            f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 95) * 1000:>10.1f}"
+            f"{percentile(values, 99) * 1000:>10.1f}{(values[-1] if values else 0.0) * 1000:>10.1f}"
+            f"{percentile(e2e, 50) * 1000:>10.1f}{percentile(e2e, 99) * 1000:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server; omit to drive app.app in-process")
+    parser.add_argument("--players", type=int, default=20, help="total simulated players to start")
+    parser.add_argument("--rate", type=float, default=2.0, help="player arrivals per second")
+    parser.add_argument("--mode", choices=["2p", "3p", "mixed"], default="2p")
+    parser.add_argument("--hands", type=int, default=3, help="stop each game after this many hands")
+    parser.add_argument("--clear-delay", type=float, default=0.0,
+                        help="seconds to wait before /clear_trick (the browser waits 1.75)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        make_client = lambda: HTTPClient(args.url, args.timeout)
+    else:
+        from app import app
+        make_client = lambda: InProcessClient(app)
+
+    seed_rng = random.Random(args.seed)
+    stats = Stats()
+    threads = []
+    started = time.perf_counter()
+    for i in range(args.players):
+        # Open loop: arrivals follow the schedule, not the server's pace.
+        delay = started + i / args.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        mode = args.mode if args.mode != "mixed" else seed_rng.choice(["2p", "3p"])
+        player = Player(make_client(), stats, mode, args.hands, args.clear_delay,
+                        random.Random(seed_rng.random()))
+        thread = threading.Thread(target=player.run, daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    report(stats, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+Nothing is installed unless PROFILE_DIR is set, so the normal request path
+pays nothing. When enabled, a single background thread per worker process
+samples the Python stack of every in-flight request every
+PROFILE_INTERVAL_MS (default 5) and keeps per-request counts. When the
+request finishes, its samples are written to PROFILE_DIR if it was selected:
+
+  * it took at least PROFILE_SLOW_MS milliseconds (default 500), or
+  * its session id is listed in PROFILE_SESSIONS (comma separated), or
+  * it won the PROFILE_SAMPLE_PERCENT lottery (0-100, default 0), or
+  * it sent an X-Profile-Token header matching PROFILE_TOKEN.
+
+Otherwise the samples are dropped. Each dump is a collapsed-stack file
+(`<name>.folded`, one "frame;frame;frame count" line per stack, readable by
+flamegraph.pl and speedscope) plus a `<name>.json` sidecar with the route,
+duration and whatever tags the app's describe callback returns (game phase,
+mode, state size).
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request, session
+
+
+class _Sampler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.active = {}  # thread id -> Counter of collapsed stacks
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def ensure_running(self):
+        # Started lazily so that each forked worker gets its own thread.
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self.run, name="request-sampler", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        own = threading.get_ident()
+        while True:
+            if not self.active:
+                self.wakeup.wait()
+                self.wakeup.clear()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for tid, stacks in self.active.items():
+                    frame = frames.get(tid)
+                    if frame is not None and tid != own:
+                        stacks[_collapse(frame)] += 1
+
+    def begin(self):
+        stacks = Counter()
+        with self.lock:
+            self.active[threading.get_ident()] = stacks
+        self.wakeup.set()
+        return stacks
+
+    def end(self):
+        with self.lock:
+            return self.active.pop(threading.get_ident(), None)
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def install(app, describe=None):
+    """Register the profiling hooks on `app` if PROFILE_DIR is configured.
+
+    `describe` is called (inside the request context) only for requests that
+    are about to be dumped, and should return a dict of extra tags.
+    """
+    out_dir = os.environ.get("PROFILE_DIR")
+    if not out_dir:
+        return None
+    slow_seconds = float(os.environ.get("PROFILE_SLOW_MS", "500")) / 1000.0
+    sample_fraction = float(os.environ.get("PROFILE_SAMPLE_PERCENT", "0")) / 100.0
+    sessions = {s.strip() for s in os.environ.get("PROFILE_SESSIONS", "").split(",") if s.strip()}
+    token = os.environ.get("PROFILE_TOKEN")
+    sampler = _Sampler(float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000.0)
+    os.makedirs(out_dir, exist_ok=True)
+
+    @app.before_request
+    def _profile_begin():
+        sampler.ensure_running()
+        g.profile_forced = bool(
+            (sample_fraction > 0 and random.random() < sample_fraction)
+            or (sessions and session.get("sid") in sessions)
+            or (token is not None and request.headers.get("X-Profile-Token") == token)
+        )
+        g.profile_started = time.perf_counter()
+        sampler.begin()
+
+    @app.after_request
+    def _profile_end(response):
+        stacks = sampler.end()
+        if stacks is None:
+            return response
+        elapsed = time.perf_counter() - g.profile_started
+        if not (g.profile_forced or elapsed >= slow_seconds):
+            return response
+        tags = {
+            "route": request.path,
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 1),
+            "samples": sum(stacks.values()),
+            "interval_ms": sampler.interval * 1000,
+            "reason": "selected" if g.profile_forced else "slow",
+            "pid": os.getpid(),
+        }
+        if describe is not None:
+            try:
+                tags.update(describe() or {})
+            except Exception as e:
+                tags["describe_error"] = str(e)
+        route = (request.endpoint or "unknown").replace("/", "_")
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{int(elapsed * 1000)}ms-{os.getpid()}-{threading.get_ident()}"
+        base = os.path.join(out_dir, name)
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(tags, f, indent=2)
+        return response
+
+    @app.teardown_request
+    def _profile_cleanup(exc):
+        # after_request is skipped when a view raises; don't leak the slot.
+        sampler.end()
+
+    return sampler
@@ -0,0 +1,360 @@
+let gameState = {};
+let gameSettings = { sound: true };
+let gameOverAlertShown = false;
+let tutorialSteps = [
+  "Step 1: Cards are dealt. Your hand and the kitty are displayed.",
+  "Step 2: During bidding, the computer's bid is shown in the Game Log.",
+  "Step 3: If you win the bid, select the trump suit.",
+  "Step 4: In the kitty phase, your original hand (top) and kitty cards (bottom) are shown. Select at least one card from your original hand to keep.",
+  "Step 5: In the draw phase, your kept cards remain selected and the rest are drawn to complete your hand.",
+  "Step 6: In trick play, when you click a card, that card moves to the Trick Area; the computer's played card will also appear.",
+  "Step 7: All game events are logged in the Game Log area."
+];
+let currentTutorialStep = 0;
+
+function updateKittyHand(originalHand, kitty) {
+  let container = document.getElementById("kitty-hand");
+  container.innerHTML = "";
+  let origDiv = document.createElement("div");
+  origDiv.className = "kitty-group";
+  origDiv.innerHTML = "<h4>Your Original Hand:</h4>";
+  originalHand.forEach((card, i) => {
+    let div = document.createElement("div");
+    div.className = "card";
+    div.textContent = card.text;
+    div.dataset.index = i;
+    div.dataset.cardtext = card.text;
+    div.onclick = function() { div.classList.toggle("selected"); };
+    origDiv.appendChild(div);
+  });
+  container.appendChild(origDiv);
+  let kittyDiv = document.createElement("div");
+  kittyDiv.className = "kitty-group";
+  kittyDiv.innerHTML = "<h4>Kitty Cards:</h4>";
+  kitty.forEach((card, i) => {
+    let div = document.createElement("div");
+    div.className = "card kitty-card";
+    div.textContent = card.text;
+    div.dataset.index = originalHand.length + i;
+    div.dataset.cardtext = card.text;
+    div.onclick = function() { div.classList.toggle("selected"); };
+    kittyDiv.appendChild(div);
+  });
+  container.appendChild(kittyDiv);
+}
+
+function updateYourHand(handArray) {
+  let container = document.getElementById("your-hand");
+  container.innerHTML = "<strong>Your Cards:</strong>";
+  if (gameState.trumpSuit) {
+    handArray = sortPlayerHand(handArray, gameState.trumpSuit);
+  }
+  handArray.forEach((card, i) => {
+    let div = document.createElement("div");
+    div.className = "card";
+    div.textContent = card.text;
+    div.dataset.cardtext = card.text;
+    div.dataset.index = i;
+    div.draggable = true;
+    div.addEventListener("dragstart", function(e) {
+      e.dataTransfer.setData("text/plain", card.text);
+    });
+    div.onclick = function() { playCard(card.text); };
+    container.appendChild(div);
+  });
+}
+
+function updateDrawHand(handArray) {
+  let container = document.getElementById("draw-hand");
+  container.innerHTML = "<strong>Your Hand:</strong>";
+  handArray.forEach((card, i) => {
+    let div = document.createElement("div");
+    div.className = "card" + (card.selected ? " selected" : "");
+    div.textContent = card.text;
+    div.dataset.cardtext = card.text;
+    div.dataset.index = i;
+    div.onclick = function() {
+      if (!card.selected) {
+        div.classList.toggle("selected");
+      }
+    };
+    container.appendChild(div);
+  });
+}
+
+function sortPlayerHand(handArray, trumpSuit) {
+  return handArray.sort((a, b) => {
+    const aTrump = is_trump(a, trumpSuit);
+    const bTrump = is_trump(b, trumpSuit);
+    if (aTrump && bTrump) {
+      return get_trump_value(b, trumpSuit) - get_trump_value(a, trumpSuit);
+    } else if (aTrump) {
+      return -1;
+    } else if (bTrump) {
+      return 1;
+    } else {
+      return get_offsuit_value(b) - get_offsuit_value(a);
+    }
+  });
+}
+
+function is_trump(card, trumpSuit) {
+  if (card.suit === trumpSuit) return true;
+  if (card.suit === "♥" && card.rank === "A") return true;
+  return false;
+}
+
+function get_trump_value(card, trumpSuit) {
+  const ranking = ["2", "3", "4", "6", "7", "8", "9", "10", "Q", "K", "A", "J", "5"];
+  return ranking.indexOf(card.rank);
+}
+
+function get_offsuit_value(card) {
+  const ranking = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"];
+  return ranking.indexOf(card.rank);
+}
+
+function updateTrumpDisplay(trumpSuit) {
+  let trumpDisplay = document.getElementById("trump-display");
+  trumpDisplay.textContent = trumpSuit ? "Trump: " + trumpSuit : "";
+}
+
+function updateFinalResult(state) {
+  // Construct final scoreboard text from the state.scoreboard object.
+  let finalScoreText = "<h3>Final Scores:</h3>";
+  for (const [player, score] of Object.entries(state.scoreboard)) {
+    finalScoreText += `<p><strong>${player}:</strong> ${score}</p>`;
+  }
+  document.getElementById("final-scoreboard").innerHTML = finalScoreText;
+}
+
+function updateUI(state) {
+  gameState = state;
+  console.log("DEBUG: Game State", state);
+  updateTrumpDisplay(state.trumpSuit);
+
+  // If game is finished, hide other sections and show final result.
+  if (state.gamePhase === "finished") {
+    document.getElementById("bidding-section").style.display = "none";
+    document.getElementById("trump-section").style.display = "none";
+    document.getElementById("kitty-section").style.display = "none";
+    document.getElementById("draw-section").style.display = "none";
+    document.getElementById("your-hand").style.display = "none";
+    document.getElementById("trick-area").style.display = "none";
+    document.getElementById("scoreboard-section").style.display = "none";
+    document.getElementById("game-log").style.display = "none";
+    document.getElementById("reset-game-btn").style.display = "none";
+    // Update and show final result section.
+    updateFinalResult(state);
+    document.getElementById("final-result").style.display = "block";
+    return;
+  } else {
+    // Show game elements if not finished.
+    document.getElementById("final-result").style.display = "none";
+    document.getElementById("scoreboard-section").style.display = "block";
+    document.getElementById("game-log").style.display = "block";
+    document.getElementById("reset-game-btn").style.display = "block";
+  }
+
+  if (state.gamePhase === "bidding") {
+    document.getElementById("bidding-section").style.display = "block";
+    document.getElementById("bidding-message").textContent = state.biddingMessage;
+  } else {
+    document.getElementById("bidding-section").style.display = "none";
+  }
+
+  if (state.gamePhase === "trump") {
+    document.getElementById("trump-section").style.display = "block";
+  } else {
+    document.getElementById("trump-section").style.display = "none";
+  }
+
+  if (state.gamePhase === "kitty") {
+    document.getElementById("your-hand").style.display = "none";
+    document.getElementById("kitty-section").style.display = "block";
+    updateKittyHand(state.originalHand || [], state.kitty || []);
+  } else {
+    document.getElementById("kitty-section").style.display = "none";
+  }
+
+  if (state.gamePhase === "draw") {
+    document.getElementById("draw-section").style.display = "block";
+    updateDrawHand(state.drawHand || state.playerHand);
+    document.getElementById("your-hand").style.display = "none";
+    if (state.computerDrawCount !== undefined) {
+      document.getElementById("computer-draw-info").textContent = "Computer drew " + state.computerDrawCount + " card(s).";
+    } else if (state.computerDrawCounts) {
+      let info = "";
+      for (const [name, count] of Object.entries(state.computerDrawCounts)) {
+        info += name + " drew " + count + " card(s). ";
+      }
+      document.getElementById("computer-draw-info").textContent = info;
+    }
+  } else {
+    document.getElementById("draw-section").style.display = "none";
+    if (state.gamePhase !== "kitty") {
+      document.getElementById("your-hand").style.display = "block";
+    }
+  }
+
+  document.getElementById("status-message").textContent = (state.currentTurn === "player") ? "Your Turn!" : `Waiting for ${state.currentTurn}...`;
+
+  if (state.gamePhase !== "draw" && state.gamePhase !== "kitty" && state.gamePhase !== "trump") {
+    updateYourHand(state.playerHand);
+  }
+
+  let trickArea = document.getElementById("trick-area");
+  trickArea.innerHTML = "<h3>Trick Area</h3>";
+  let trickCards = (state.currentTrick && state.currentTrick.length > 0) ? state.currentTrick : state.lastTrick;
+  if (trickCards && trickCards.length > 0) {
+    trickCards.forEach(entry => {
+      let div = document.createElement("div");
+      div.className = "card played";
+      div.textContent = entry.card.text;
+      trickArea.appendChild(div);
+    });
+  } else {
+    trickArea.innerHTML += "<p>No cards played yet.</p>";
+  }
+
+  let scoreboardDiv = document.getElementById("scoreboard");
+  scoreboardDiv.innerHTML = Object.entries(state.scoreboard)
+    .map(([player, score]) => `<strong>${player}:</strong> ${score}`)
+    .join("<br>");
+
+  let logDiv = document.getElementById("game-log");
+  logDiv.innerHTML = "<strong>Game Log:</strong><br>" + state.gameNotes.slice().reverse().join("<br>");
+
+  if (state.gamePhase === "trickComplete") {
+    setTimeout(() => {
+      callAPI("/clear_trick", "POST", {});
+    }, 1750);
+  }
+}
+
+async function callAPI(endpoint, method = "POST", data = {}, attempt = 0) {
+  try {
+    let response = await fetch(endpoint, {
+      method: method,
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(data)
+    });
+    // 429/503 mean "busy, try again shortly"; honour Retry-After a few times.
+    if ((response.status === 429 || response.status === 503) && attempt < 3) {
+      let delay = parseFloat(response.headers.get("Retry-After")) || 1;
+      await new Promise(resolve => setTimeout(resolve, delay * 1000));
+      return callAPI(endpoint, method, data, attempt + 1);
+    }
+    let result = await response.json();
+    updateUI(result);
+  } catch (err) {
+    console.error("API call error:", err);
+  }
+}
+
+function startGame() {
+  let mode = document.getElementById("mode-select").value;
+  let instructional = document.getElementById("instruction-mode").checked;
+  gameOverAlertShown = false;
+  document.getElementById("game-options").style.display = "none";
+  document.getElementById("game-container").style.display = "block";
+  callAPI("/start_game", "POST", { mode: mode, instructional: instructional });
+}
+
+function playCard(cardText) {
+  try {
+    if (gameSettings.sound) {
+      document.getElementById("card-sound").play().catch(e => console.error("Audio play error:", e));
+    }
+  } catch (e) {
+    console.error("Audio play error:", e);
+  }
+  callAPI("/play_trick", "POST", { cardText: cardText });
+}
+
+function confirmDraw() {
+  let container = document.getElementById("draw-hand");
+  let selectedDivs = container.querySelectorAll(".card.selected");
+  let indices = [];
+  selectedDivs.forEach(div => indices.push(parseInt(div.dataset.index)));
+  callAPI("/confirm_draw", "POST", { keptIndices: indices });
+}
+
+function confirmKitty() {
+  let container = document.getElementById("kitty-hand");
+  let selectedDivs = container.querySelectorAll(".card.selected");
+  let indices = [];
+  selectedDivs.forEach(div => indices.push(parseInt(div.dataset.index)));
+  callAPI("/confirm_kitty", "POST", { keptIndices: indices });
+}
+
+function selectTrump(trump) {
+  callAPI("/select_trump", "POST", { trump: trump });
+}
+
+function resetGame() {
+  callAPI("/reset_game", "POST", {}).then(() => {
+    document.getElementById("game-container").style.display = "none";
+    document.getElementById("game-options").style.display = "block";
+  });
+}
+
+function toggleInstructions() {
+  let instrDiv = document.getElementById("instructions");
+  instrDiv.style.display = (instrDiv.style.display === "none" || instrDiv.style.display === "") ? "block" : "none";
+}
+
+function openTutorial() {
+  currentTutorialStep = 0;
+  showTutorialStep();
+  document.getElementById("tutorial-modal").style.display = "flex";
+}
+
+function closeTutorial() {
+  document.getElementById("tutorial-modal").style.display = "none";
+}
+
+function showTutorialStep() {
+  let contentDiv = document.getElementById("tutorial-step-content");
+  contentDiv.innerHTML = "<p>" + tutorialSteps[currentTutorialStep] + "</p>";
+}
+
+function nextTutorialStep() {
+  if (currentTutorialStep < tutorialSteps.length - 1) {
+    currentTutorialStep++;
+    showTutorialStep();
+  }
+}
+
+function prevTutorialStep() {
+  if (currentTutorialStep > 0) {
+    currentTutorialStep--;
+    showTutorialStep();
+  }
+}
+
+document.addEventListener("DOMContentLoaded", function() {
+  document.getElementById("start-game-btn").addEventListener("click", startGame);
+  document.getElementById("reset-game-btn").addEventListener("click", resetGame);
+  document.getElementById("show-tutorial-btn").addEventListener("click", openTutorial);
+  document.getElementById("show-instructions-btn").addEventListener("click", toggleInstructions);
+  document.getElementById("hide-instructions-btn").addEventListener("click", toggleInstructions);
+  document.getElementById("next-tutorial-btn").addEventListener("click", nextTutorialStep);
+  document.getElementById("prev-tutorial-btn").addEventListener("click", prevTutorialStep);
+  document.getElementById("close-tutorial-btn").addEventListener("click", closeTutorial);
+  document.querySelectorAll(".bid-btn").forEach(function(button) {
+    button.addEventListener("click", function() {
+      let bidValue = parseInt(this.getAttribute("data-bid"));
+      callAPI("/bid", "POST", { bid: bidValue });
+    });
+  });
+  document.querySelectorAll(".trump-btn").forEach(function(button) {
+    button.addEventListener("click", function() {
+      let trump = this.getAttribute("data-trump");
+      selectTrump(trump);
+    });
+  });
+  document.getElementById("confirm-kitty-btn").addEventListener("click", confirmKitty);
+  document.getElementById("confirm-draw-btn").addEventListener("click", confirmDraw);
+  document.getElementById("play-again-btn").addEventListener("click", resetGame);
+});
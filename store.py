@@ -11,30 +11,44 @@ Games are arbitrary Python objects (game_logic.Game), so they're serialized
 with pickle and stored as bytes. This keeps the store fully decoupled from
 the shape of Game/Card, so it doesn't need to change every time the game
 logic does.
+
+Nothing connects at import time: each process opens its own engine lazily
+on first use, which keeps `gunicorn --preload` safe (gunicorn.conf.py calls
+warm_up() in each worker so that cost is paid before it takes traffic). The
+schema is created on that first use unless STORE_AUTO_MIGRATE=0, in which
+case run `python store.py migrate` once per deploy instead; that is the
+expected production setup.
 """
 
 import os
 import pickle
 import threading
+import time
+from contextlib import contextmanager
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Set STORE_AUTO_MIGRATE=0 when the schema is created ahead of time with
+# `python store.py migrate` (e.g. a release/pre-deploy command), so workers
+# never run DDL on startup.
+AUTO_MIGRATE = os.environ.get("STORE_AUTO_MIGRATE", "1") != "0"
+
 _lock = threading.Lock()
 _memory_store = {}
 
 _engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
 _metadata = None
 _games_table = None
 
 if DATABASE_URL:
     # Lazy/optional import so the app still runs with zero extra
-    # dependencies when no database is configured.
+    # dependencies when no database is configured. Only the table
+    # definition happens at import; no connection is opened until a worker
+    # first touches the store (see _get_engine).
     from sqlalchemy import create_engine, MetaData, Table, Column, String, LargeBinary, DateTime, func
 
-    # Railway (and most providers) hand out a postgres:// URL; SQLAlchemy
-    # with psycopg2 wants postgresql://.
-    db_url = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-    _engine = create_engine(db_url, pool_pre_ping=True)
     _metadata = MetaData()
     _games_table = Table(
         "games",
@@ -43,12 +57,80 @@ if DATABASE_URL:
         Column("data", LargeBinary, nullable=False),
         Column("updated_at", DateTime(timezone=True), server_default=func.now(), onupdate=func.now()),
     )
-    _metadata.create_all(_engine)
+
+
+def _create_engine():
+    # Railway (and most providers) hand out a postgres:// URL; SQLAlchemy
+    # with psycopg2 wants postgresql://.
+    db_url = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    return create_engine(db_url, pool_pre_ping=True)
+
+
+def _get_engine():
+    """Return this process's engine, creating it on first use.
+
+    Engines (and their pooled connections) must not be shared across
+    fork(), so a worker forked from a preloaded master that already had
+    one builds its own.
+    """
+    global _engine, _engine_pid
+    if _engine is not None and _engine_pid == os.getpid():
+        return _engine
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            if _engine is not None:
+                # Drop the parent's pool without closing its sockets.
+                _engine.dispose(close=False)
+            engine = _create_engine()
+            if AUTO_MIGRATE:
+                _metadata.create_all(engine)
+            _engine, _engine_pid = engine, os.getpid()
+    return _engine
+
+
+class StoreUnavailable(Exception):
+    """The database couldn't be reached or had no free connection."""
+
+
+@contextmanager
+def _connection():
+    from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeout
+
+    try:
+        with _get_engine().begin() as conn:
+            yield conn
+    except (OperationalError, PoolTimeout) as e:
+        raise StoreUnavailable(str(e)) from e
+
+
+def warm_up():
+    """Open this process's engine and first connection now instead of on the
+    first request. Returns the seconds it took, or None for the in-memory store.
+    """
+    if not DATABASE_URL:
+        return None
+    started = time.monotonic()
+    with _connection():
+        pass
+    return time.monotonic() - started
+
+
+def migrate():
+    """Create the schema. Safe to run repeatedly."""
+    if not DATABASE_URL:
+        return False
+    engine = _create_engine()
+    try:
+        _metadata.create_all(engine)
+    finally:
+        engine.dispose()
+    return True
 
 
 def save_game(session_id, game):
+    """Persist `game` and return the size of its pickled state in bytes."""
     blob = pickle.dumps(game)
-    if _engine is not None:
+    if DATABASE_URL:
         from sqlalchemy import insert
         from sqlalchemy.dialects.postgresql import insert as pg_insert
 
@@ -56,18 +138,19 @@ def save_game(session_id, game):
         stmt = stmt.on_conflict_do_update(
             index_elements=["session_id"], set_={"data": blob}
         )
-        with _engine.begin() as conn:
+        with _connection() as conn:
             conn.execute(stmt)
     else:
         with _lock:
             _memory_store[session_id] = blob
+    return len(blob)
 
 
 def load_game(session_id):
-    if _engine is not None:
+    if DATABASE_URL:
         from sqlalchemy import select
 
-        with _engine.begin() as conn:
+        with _connection() as conn:
             row = conn.execute(
                 select(_games_table.c.data).where(_games_table.c.session_id == session_id)
             ).fetchone()
@@ -81,9 +164,19 @@ def load_game(session_id):
 
 
 def delete_game(session_id):
-    if _engine is not None:
-        with _engine.begin() as conn:
+    if DATABASE_URL:
+        with _connection() as conn:
             conn.execute(_games_table.delete().where(_games_table.c.session_id == session_id))
     else:
         with _lock:
             _memory_store.pop(session_id, None)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python store.py migrate")
+    if not migrate():
+        sys.exit("DATABASE_URL is not set; the in-memory store needs no migration.")
+    print("games table is up to date.")